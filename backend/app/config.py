@@ -21,10 +21,22 @@ class Settings:
     # Retrieval
     TOP_K: int = int(os.getenv("TOP_K", "5"))
 
+    # Vector store sharding
+    NUM_SHARDS: int = int(os.getenv("NUM_SHARDS", "4"))
+    SEARCH_WORKERS: int = int(os.getenv("SEARCH_WORKERS", str(os.cpu_count() or 1)))
+
+    # Re-indexing when chunking/embedding settings change
+    AUTO_REINDEX: bool = os.getenv("AUTO_REINDEX", "true").lower() in ("1", "true", "yes")
+    REINDEX_BATCH_SIZE: int = int(os.getenv("REINDEX_BATCH_SIZE", "256"))
+
+    # Uploads
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+    UPLOAD_CHUNK_BYTES: int = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
     # Paths
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    UPLOAD_DIR: str = os.path.join(BASE_DIR, "uploads")
-    DATA_DIR: str = os.path.join(BASE_DIR, "data")
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", os.path.join(BASE_DIR, "uploads"))
+    DATA_DIR: str = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "data"))
 
     # CORS
     CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:3000"]
@@ -0,0 +1,177 @@
+"""
+Chunk Table — columnar chunk metadata for the vector store.
+Instead of one dict per chunk, doc_id/filename are interned once per document and
+referenced by an int32 code, chunk indices live in an int32 array, and all chunk
+texts share a single UTF-8 buffer addressed by an offset array.
+Result dicts are only materialized for the handful of rows a search returns.
+"""
+
+import os
+import numpy as np
+from typing import Optional
+
+
+class ChunkTable:
+    """
+    Immutable columnar store of chunk metadata.
+    `append` and `take` return new tables, so a reader holding an old table
+    (e.g. a search snapshot) is never affected by concurrent writes.
+    """
+
+    def __init__(
+        self,
+        doc_ids: Optional[list[str]] = None,
+        filenames: Optional[list[str]] = None,
+        doc_codes: Optional[np.ndarray] = None,
+        chunk_index: Optional[np.ndarray] = None,
+        text_offsets: Optional[np.ndarray] = None,
+        text_buffer: Optional[np.ndarray] = None,
+    ):
+        self.doc_ids: list[str] = doc_ids or []  # code -> doc_id
+        self.filenames: list[str] = filenames or []  # code -> filename
+        self.doc_codes = doc_codes if doc_codes is not None else np.empty(0, dtype=np.int32)
+        self.chunk_index = chunk_index if chunk_index is not None else np.empty(0, dtype=np.int32)
+        self.text_offsets = text_offsets if text_offsets is not None else np.zeros(1, dtype=np.int64)
+        self.text_buffer = text_buffer if text_buffer is not None else np.empty(0, dtype=np.uint8)
+        self._codes = {doc_id: code for code, doc_id in enumerate(self.doc_ids)}
+
+    def __len__(self) -> int:
+        return len(self.doc_codes)
+
+    @classmethod
+    def from_dicts(cls, chunks: list[dict]) -> "ChunkTable":
+        return cls().append(chunks)
+
+    @classmethod
+    def concat(cls, tables: list["ChunkTable"]) -> "ChunkTable":
+        """Join tables end to end in one pass, merging their doc code spaces."""
+        if not tables:
+            return cls()
+        doc_ids: list[str] = []
+        filenames: list[str] = []
+        codes: dict[str, int] = {}
+        doc_codes, offsets, base = [], [np.zeros(1, dtype=np.int64)], 0
+        for table in tables:
+            remap = np.empty(len(table.doc_ids), dtype=np.int32)
+            for old_code, (doc_id, filename) in enumerate(zip(table.doc_ids, table.filenames)):
+                code = codes.get(doc_id)
+                if code is None:
+                    code = codes[doc_id] = len(doc_ids)
+                    doc_ids.append(doc_id)
+                    filenames.append(filename)
+                remap[old_code] = code
+            doc_codes.append(remap[table.doc_codes])
+            offsets.append(table.text_offsets[1:] + base)
+            base += int(table.text_offsets[-1])
+
+        return cls(
+            doc_ids=doc_ids,
+            filenames=filenames,
+            doc_codes=np.concatenate(doc_codes).astype(np.int32),
+            chunk_index=np.concatenate([t.chunk_index for t in tables]),
+            text_offsets=np.concatenate(offsets),
+            text_buffer=np.concatenate([t.text_buffer for t in tables]),
+        )
+
+    def append(self, chunks: list[dict]) -> "ChunkTable":
+        """Return a new table with `chunks` (dicts as produced by chunk_text) added at the end."""
+        doc_ids = list(self.doc_ids)
+        filenames = list(self.filenames)
+        codes = dict(self._codes)
+
+        new_codes = np.empty(len(chunks), dtype=np.int32)
+        new_index = np.empty(len(chunks), dtype=np.int32)
+        encoded = []
+        for i, chunk in enumerate(chunks):
+            doc_id = chunk.get("doc_id", "")
+            code = codes.get(doc_id)
+            if code is None:
+                code = codes[doc_id] = len(doc_ids)
+                doc_ids.append(doc_id)
+                filenames.append(chunk.get("filename", ""))
+            new_codes[i] = code
+            new_index[i] = chunk.get("chunk_index", 0)
+            encoded.append(chunk.get("text", "").encode("utf-8"))
+
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        new_offsets = self.text_offsets[-1] + np.cumsum(lengths)
+        new_buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        return ChunkTable(
+            doc_ids=doc_ids,
+            filenames=filenames,
+            doc_codes=np.concatenate([self.doc_codes, new_codes]),
+            chunk_index=np.concatenate([self.chunk_index, new_index]),
+            text_offsets=np.concatenate([self.text_offsets, new_offsets]),
+            text_buffer=np.concatenate([self.text_buffer, new_buffer]),
+        )
+
+    def take(self, rows: np.ndarray) -> "ChunkTable":
+        """Return a new table holding only `rows` (ascending), with unused doc codes dropped."""
+        rows = np.asarray(rows, dtype=np.int64)
+        used_codes, doc_codes = np.unique(self.doc_codes[rows], return_inverse=True)
+
+        keep = np.zeros(len(self), dtype=bool)
+        keep[rows] = True
+        lengths = np.diff(self.text_offsets)
+        text_offsets = np.concatenate([[0], np.cumsum(lengths[rows])]).astype(np.int64)
+        # One bool per text byte (not an int64 index per byte) keeps the temporary
+        # memory at the size of the buffer itself
+        byte_mask = np.repeat(keep, lengths)
+
+        return ChunkTable(
+            doc_ids=[self.doc_ids[c] for c in used_codes],
+            filenames=[self.filenames[c] for c in used_codes],
+            doc_codes=doc_codes.astype(np.int32),
+            chunk_index=self.chunk_index[rows],
+            text_offsets=text_offsets,
+            text_buffer=self.text_buffer[byte_mask],
+        )
+
+    def rows_for_doc(self, doc_id: str) -> np.ndarray:
+        """Boolean mask of the rows belonging to doc_id."""
+        code = self._codes.get(doc_id)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.doc_codes == code
+
+    def text(self, row: int) -> str:
+        start, end = self.text_offsets[row], self.text_offsets[row + 1]
+        return self.text_buffer[start:end].tobytes().decode("utf-8")
+
+    def row(self, row: int) -> dict:
+        """Materialize one row as the chunk dict shape used across the app."""
+        code = self.doc_codes[row]
+        return {
+            "text": self.text(row),
+            "doc_id": self.doc_ids[code],
+            "filename": self.filenames[code],
+            "chunk_index": int(self.chunk_index[row]),
+        }
+
+    def save(self, path: str):
+        """Write all columns to a single .npz (no pickling)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                doc_ids=np.array(self.doc_ids, dtype=np.str_),
+                filenames=np.array(self.filenames, dtype=np.str_),
+                doc_codes=self.doc_codes,
+                chunk_index=self.chunk_index,
+                text_offsets=self.text_offsets,
+                text_buffer=self.text_buffer,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ChunkTable":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                doc_ids=data["doc_ids"].tolist(),
+                filenames=data["filenames"].tolist(),
+                doc_codes=data["doc_codes"],
+                chunk_index=data["chunk_index"],
+                text_offsets=data["text_offsets"],
+                text_buffer=data["text_buffer"],
+            )
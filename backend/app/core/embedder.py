@@ -1,29 +1,48 @@
 """
 SBERT Embedder — wraps sentence-transformers for embedding texts and queries.
-Loads the model once (singleton) to avoid repeated loading overhead.
+Loads each model once (one instance per model name) to avoid repeated loading overhead.
+While a re-index to a new EMBEDDING_MODEL runs, the live index keeps being queried
+with the model it was built with, so two models can be loaded at the same time.
 """
 
+import threading
 import numpy as np
+from typing import Optional
 from sentence_transformers import SentenceTransformer
 from app.config import settings
 
 
 class Embedder:
-    """Singleton-style SBERT embedding wrapper."""
+    """SBERT embedding wrapper; `Embedder(name)` returns the one instance for that model."""
 
-    _instance = None
-    _model = None
+    _instances: dict[str, "Embedder"] = {}
+    _instances_lock = threading.Lock()
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    def __new__(cls, model_name: Optional[str] = None):
+        model_name = model_name or settings.EMBEDDING_MODEL
+        with cls._instances_lock:
+            instance = cls._instances.get(model_name)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.model_name = model_name
+                instance._model = None
+                instance._load_lock = threading.Lock()
+                cls._instances[model_name] = instance
+        return instance
+
+    @classmethod
+    def release(cls, model_name: str):
+        """Forget a model's instance (e.g. the old model after a re-index) so it can be freed."""
+        with cls._instances_lock:
+            cls._instances.pop(model_name, None)
 
     def _load_model(self):
         if self._model is None:
-            print(f"[Embedder] Loading SBERT model: {settings.EMBEDDING_MODEL}")
-            self._model = SentenceTransformer(settings.EMBEDDING_MODEL)
-            print("[Embedder] Model loaded successfully.")
+            with self._load_lock:
+                if self._model is None:
+                    print(f"[Embedder] Loading SBERT model: {self.model_name}")
+                    self._model = SentenceTransformer(self.model_name)
+                    print("[Embedder] Model loaded successfully.")
 
     def embed_texts(self, texts: list[str]) -> np.ndarray:
         """
@@ -50,5 +69,5 @@ class Embedder:
         return self._model.get_sentence_embedding_dimension()
 
 
-# Global instance
+# Global instance for the configured EMBEDDING_MODEL
 embedder = Embedder()
@@ -0,0 +1,203 @@
+"""
+Metadata Store — document metadata in an embedded SQLite database.
+Runs in WAL mode with separate read connections, so listing and lookups never
+wait for a write in progress, with indexes on doc_id, filename and upload_time
+for paginated listing.
+Replaces the old documents_meta.json read-modify-write file.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from app.config import settings
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id      TEXT PRIMARY KEY,
+    filename    TEXT NOT NULL,
+    file_path   TEXT,
+    num_chunks  INTEGER NOT NULL,
+    upload_time TEXT,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents (filename);
+CREATE INDEX IF NOT EXISTS idx_documents_upload_time ON documents (upload_time);
+"""
+
+
+class MetadataStore:
+    """
+    Thin wrapper around SQLite, shared by the request handlers and the background
+    re-indexer. Writes go through one connection and `transaction()`, which holds
+    the write lock; callers also wrap it around the matching vector store update so
+    the metadata only commits once the vectors are on disk.
+    Reads use a per-thread read-only connection and take no lock: under WAL they
+    see the last committed state and never wait for a writer.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path or os.path.join(settings.DATA_DIR, "metadata.db")
+        # Pre-SQLite metadata file, imported on first connect
+        self._legacy_path = os.path.join(os.path.dirname(self._db_path), "documents_meta.json")
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        self._readers: set[sqlite3.Connection] = set()
+        self._readers_lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: we issue BEGIN/COMMIT ourselves in transaction()
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._migrate_schema(conn)
+        self._migrate_legacy(conn)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read-only connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn not in self._readers:
+            self.conn  # create the database and run migrations first
+            conn = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only=ON")
+            with self._readers_lock:
+                self._readers.add(conn)
+            self._local.conn = conn
+        return conn
+
+    def _migrate_schema(self, conn: sqlite3.Connection):
+        """Bring a database created by an earlier version up to the current schema."""
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(documents)")}
+        if "content_hash" not in columns:
+            conn.execute("ALTER TABLE documents ADD COLUMN content_hash TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents (content_hash)")
+        # Per-chunk rows duplicated the vector store's ChunkTable and were never read
+        conn.execute("DROP TABLE IF EXISTS chunks")
+
+    def _migrate_legacy(self, conn: sqlite3.Connection):
+        """Import documents_meta.json once, then move it aside."""
+        if not os.path.exists(self._legacy_path):
+            return
+        with open(self._legacy_path, "r") as f:
+            legacy = json.load(f)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO documents (doc_id, filename, file_path, num_chunks, upload_time) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (doc_id, meta["filename"], meta.get("file_path"), meta["num_chunks"], meta.get("upload_time"))
+                for doc_id, meta in legacy.items()
+            ],
+        )
+        conn.execute("COMMIT")
+        os.replace(self._legacy_path, self._legacy_path + ".migrated")
+        print(f"[MetadataStore] Imported {len(legacy)} documents from documents_meta.json")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of writes atomically. Nested calls join the outer transaction.
+        Rolls back if the block (including any vector store work inside it) raises.
+        """
+        with self._lock:
+            conn = self.conn
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def add_document(
+        self,
+        doc_id: str,
+        filename: str,
+        file_path: str,
+        num_chunks: int,
+        upload_time: str,
+        content_hash: Optional[str] = None,
+    ):
+        """Insert a document row."""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO documents (doc_id, filename, file_path, num_chunks, upload_time, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, filename, file_path, num_chunks, upload_time, content_hash),
+            )
+
+    def set_num_chunks(self, num_chunks: dict[str, int]):
+        """Update num_chunks for re-chunked documents ({doc_id: count}); deleted ones are skipped."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE documents SET num_chunks = ? WHERE doc_id = ?",
+                [(count, doc_id) for doc_id, count in num_chunks.items()],
+            )
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        return self._reader().execute(sql, params).fetchall()
+
+    def get_document(self, doc_id: str) -> Optional[dict]:
+        rows = self._fetchall("SELECT * FROM documents WHERE doc_id = ?", (doc_id,))
+        return dict(rows[0]) if rows else None
+
+    def find_by_hash(self, content_hash: str) -> Optional[dict]:
+        """Return an already-stored document with identical content, if any."""
+        # A row left without chunks must not absorb a re-upload of the same file
+        rows = self._fetchall(
+            "SELECT * FROM documents WHERE content_hash = ? AND num_chunks > 0 LIMIT 1", (content_hash,),
+        )
+        return dict(rows[0]) if rows else None
+
+    def list_documents(self, offset: int = 0, limit: int = 100) -> list[dict]:
+        """Return one page of documents in upload order."""
+        rows = self._fetchall(
+            "SELECT * FROM documents ORDER BY upload_time, doc_id LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [dict(r) for r in rows]
+
+    def count_documents(self) -> int:
+        return self._fetchall("SELECT COUNT(*) FROM documents")[0][0]
+
+    def get_all_doc_ids(self) -> set[str]:
+        return {r[0] for r in self._fetchall("SELECT doc_id FROM documents")}
+
+    def delete_document(self, doc_id: str) -> bool:
+        """Delete a document. Returns False if it didn't exist."""
+        with self.transaction() as conn:
+            cursor = conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            return cursor.rowcount > 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+
+# Global instance
+metadata_store = MetadataStore()
@@ -7,9 +7,12 @@ RAG Pipeline — orchestrates the full Retrieval-Augmented Generation flow.
 5. Return the answer with source references
 """
 
-from app.core.embedder import embedder
-from app.core.vector_store import vector_store
+from app.core.embedder import Embedder
+from app.core.vector_store import vector_store, EmbeddingDimensionError
 from app.utils import ollama_client
+from app.utils.metrics import (
+    stage_timer, queries_total, prompt_chars, generations_in_flight,
+)
 from app.config import settings
 
 
@@ -56,13 +59,26 @@ async def query(question: str, top_k: int = None) -> dict:
     if top_k is None:
         top_k = settings.TOP_K
 
-    # Step 1: Embed the query
-    query_embedding = embedder.embed_query(question)
+    # Step 1: Embed the query with the model the live index was built with,
+    # which differs from EMBEDDING_MODEL while a re-index is pending
+    with stage_timer("embed_query"):
+        query_embedding = Embedder(vector_store.embedding_model).embed_query(question)
 
     # Step 2: Retrieve top-k chunks
-    results = vector_store.search(query_embedding, top_k=top_k)
+    try:
+        with stage_timer("vector_search"):
+            results = vector_store.search(query_embedding, top_k=top_k)
+    except EmbeddingDimensionError as e:
+        # The index was swapped to a new model between the two steps
+        queries_total.inc(status="error")
+        return {
+            "answer": "The document index is being rebuilt. Please try again in a moment.",
+            "sources": [],
+            "error": str(e),
+        }
 
     if not results:
+        queries_total.inc(status="no_documents")
         return {
             "answer": "No documents have been uploaded yet. Please upload some documents first, then ask your question.",
             "sources": [],
@@ -70,12 +86,16 @@ async def query(question: str, top_k: int = None) -> dict:
         }
 
     # Step 3: Build prompt
-    prompt = build_prompt(question, results)
+    with stage_timer("build_prompt"):
+        prompt = build_prompt(question, results)
+    prompt_chars.observe(len(prompt))
 
     # Step 4: Generate answer via Ollama
     try:
-        answer = await ollama_client.generate(prompt, system_prompt=SYSTEM_PROMPT)
+        with stage_timer("generate"), generations_in_flight.track_in_progress():
+            answer = await ollama_client.generate(prompt, system_prompt=SYSTEM_PROMPT)
     except Exception as e:
+        queries_total.inc(status="error")
         return {
             "answer": f"Error connecting to Ollama: {str(e)}. Make sure Ollama is running with model '{settings.OLLAMA_MODEL}'.",
             "sources": [],
@@ -83,6 +103,7 @@ async def query(question: str, top_k: int = None) -> dict:
         }
 
     # Step 5: Return answer + sources
+    queries_total.inc(status="ok")
     sources = [
         {
             "filename": r.get("filename", "Unknown"),
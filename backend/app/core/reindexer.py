@@ -0,0 +1,316 @@
+"""
+Re-indexer — rebuilds the vector store after EMBEDDING_MODEL, CHUNK_SIZE or CHUNK_OVERLAP change.
+Works from the original files in UPLOAD_DIR, embedding in batches, while queries keep
+being served from the live index. Each batch is appended once to a segment log under
+DATA_DIR/reindex/segments/, and the shadow index is assembled from it in a single pass.
+When every document is done the shadow is swapped in atomically; if any document
+fails (e.g. its original file is missing) the swap is held back, since the new index
+would silently lose it, until the document is fixed or deleted and the re-index rerun.
+
+Resumable: documents recorded in the segment log are skipped when the re-index is restarted.
+"""
+
+import os
+import json
+import shutil
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.core.chunk_table import ChunkTable
+from app.core.chunker import chunk_text
+from app.core.document_processor import process_file
+from app.core.embedder import Embedder
+from app.core.metadata_store import metadata_store
+from app.core.vector_store import (
+    VectorStore, vector_store, index_params, shard_for_doc, _atomic_save_npy, _atomic_save_json,
+)
+from app.utils.metrics import Counter, stage_timer
+from app.utils.uploads import resolve_upload
+
+
+reindexed_documents_total = Counter(
+    "rag_reindexed_documents_total", "Documents processed by the background re-indexer, by outcome.", ("status",),
+)
+
+PAGE_SIZE = 500
+
+
+class SegmentLog:
+    """
+    Append-only record of re-indexed batches. Every batch is written once, split into
+    per-shard segment files, and then listed in progress.jsonl — so a batch costs the
+    same no matter how far along the re-index is, and a crash loses at most the
+    batch in flight. Only segments listed in progress.jsonl exist as far as `open()`
+    and `build()` are concerned; files from a batch that never got its line are
+    deleted on open. `build()` concatenates all segments into the shadow index.
+    """
+
+    def __init__(self, root: str, num_shards: int):
+        self._root = root
+        self._dir = os.path.join(root, "segments")
+        self._params_path = os.path.join(self._dir, "params.json")
+        self._progress_path = os.path.join(self._dir, "progress.jsonl")
+        self.num_shards = num_shards
+        self.segments: dict[int, list[int]] = {}  # segment -> shard ids it has files for
+
+    def _segment_path(self, segment: int, shard_id: int) -> str:
+        return os.path.join(self._dir, f"segment_{segment:06d}_shard_{shard_id:03d}")
+
+    def open(self, params: dict) -> set[str]:
+        """Resume the log if it was built for `params`, else start a new one. Returns the doc_ids already done."""
+        expected = {"index_params": params, "num_shards": self.num_shards}
+        if os.path.exists(self._params_path):
+            with open(self._params_path, "r", encoding="utf-8") as f:
+                if json.load(f) != expected:
+                    print("[Reindexer] Discarding a partial re-index built for other settings.")
+                    shutil.rmtree(self._root)
+        os.makedirs(self._dir, exist_ok=True)
+        if not os.path.exists(self._params_path):
+            _atomic_save_json(self._params_path, expected)
+
+        self.segments, done, lines = {}, set(), []
+        if os.path.exists(self._progress_path):
+            with open(self._progress_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line from a crash; that batch is redone
+                    self.segments[entry["segment"]] = entry["shards"]
+                    done.update(entry["doc_ids"])
+                    lines.append(line)
+            with open(self._progress_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+        self._remove_unrecorded()
+        return done
+
+    def _remove_unrecorded(self):
+        """Delete segment files (and temp files) left by a batch that failed before its progress line."""
+        recorded = {
+            os.path.basename(self._segment_path(segment, shard_id))
+            for segment, shard_ids in self.segments.items()
+            for shard_id in shard_ids
+        }
+        for name in os.listdir(self._dir):
+            if name.startswith("segment_") and (name.endswith(".tmp") or name.split(".")[0] not in recorded):
+                os.remove(os.path.join(self._dir, name))
+
+    def append(self, embeddings: np.ndarray, chunks: list[dict], doc_ids: list[str]):
+        """Write one batch as new segment files, then record it as done."""
+        segment = max(self.segments) + 1 if self.segments else 0
+        groups: dict[int, list[int]] = {}
+        for i, chunk in enumerate(chunks):
+            groups.setdefault(shard_for_doc(chunk["doc_id"], self.num_shards), []).append(i)
+        for shard_id, rows in groups.items():
+            path = self._segment_path(segment, shard_id)
+            _atomic_save_npy(path + ".npy", embeddings[rows])
+            ChunkTable.from_dicts([chunks[i] for i in rows]).save(path + ".npz")
+
+        with open(self._progress_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"segment": segment, "shards": sorted(groups), "doc_ids": doc_ids}) + "\n")
+        self.segments[segment] = sorted(groups)
+
+    def build(self) -> VectorStore:
+        """Assemble the shadow index under <root>/index from every segment, writing each shard once."""
+        shutil.rmtree(os.path.join(self._root, "index"), ignore_errors=True)
+        shadow = VectorStore(data_dir=self._root, num_shards=self.num_shards)
+        for shard in shadow.shards:
+            paths = [
+                self._segment_path(segment, shard.shard_id)
+                for segment, shard_ids in sorted(self.segments.items())
+                if shard.shard_id in shard_ids
+            ]
+            if paths:
+                shard.set_contents(
+                    np.concatenate([np.load(path + ".npy") for path in paths]),
+                    ChunkTable.concat([ChunkTable.load(path + ".npz") for path in paths]),
+                )
+        shadow.save()
+        return shadow
+
+
+class Reindexer:
+    """Runs one background re-index at a time and reports its progress."""
+
+    def __init__(self, store: VectorStore = vector_store):
+        self._store = store
+        self._shadow_dir = os.path.join(settings.DATA_DIR, "reindex")
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.status: dict = {"state": "idle"}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start a background re-index. Returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self.status = {
+                "state": "running",
+                "started_at": datetime.now().isoformat(),
+                "from_params": self._store.index_params,
+                "to_params": None,
+                "documents_total": 0,
+                "documents_done": 0,
+                "failed": {},
+            }
+            self._thread = threading.Thread(target=self._run, name="reindexer", daemon=True)
+            self._thread.start()
+            return True
+
+    def start_if_needed(self):
+        """On startup: re-index (or resume) if the live index is stale, else clear any leftover shadow."""
+        if self._store.stale:
+            if settings.AUTO_REINDEX:
+                self.start()
+            else:
+                print("[Reindexer] Index is stale but AUTO_REINDEX is off; POST /api/index/reindex to rebuild.")
+        elif os.path.isdir(self._shadow_dir):
+            shutil.rmtree(self._shadow_dir)
+
+    def _run(self):
+        try:
+            params = index_params()
+            log = SegmentLog(self._shadow_dir, settings.NUM_SHARDS)
+            self.status["to_params"] = params
+            done = log.open(params)
+            if done:
+                print(f"[Reindexer] Resuming: {len(done)} documents already re-indexed.")
+
+            # Keep sweeping until no document is missing, which also picks up
+            # documents uploaded while the re-index was running
+            failed = self.status["failed"]
+            while True:
+                documents = self._all_documents()
+                live_ids = {d["doc_id"] for d in documents}
+                for doc_id in set(failed) - live_ids:
+                    del failed[doc_id]  # deleted since it failed
+                pending = [d for d in documents if d["doc_id"] not in done and d["doc_id"] not in failed]
+                self.status["documents_total"] = len(done & live_ids) + len(pending) + len(failed)
+                self.status["documents_done"] = len(done & live_ids)
+                if pending:
+                    self._reindex_documents(log, params["embedding_model"], pending, done)
+                elif failed:
+                    # Keep the live index (and the shadow, to resume from) rather than drop these documents
+                    self.status["state"] = "blocked"
+                    self.status["error"] = (
+                        f"{len(failed)} document(s) could not be re-indexed; restore or delete them, "
+                        f"then POST /api/index/reindex to resume."
+                    )
+                    print(f"[Reindexer] Not swapping: {self.status['error']}")
+                    return
+                else:
+                    with stage_timer("reindex_build"):
+                        shadow = log.build()
+                    if self._swap(shadow, done):
+                        break
+            self.status["state"] = "done"
+            self.status["finished_at"] = datetime.now().isoformat()
+            print(f"[Reindexer] Done: {self._store.total_chunks} chunks from {len(done)} documents.")
+        except Exception as e:
+            self.status["state"] = "failed"
+            self.status["error"] = str(e)
+            print(f"[Reindexer] Failed: {e}")
+
+    @staticmethod
+    def _all_documents() -> list[dict]:
+        documents, offset = [], 0
+        while True:
+            page = metadata_store.list_documents(offset=offset, limit=PAGE_SIZE)
+            documents.extend(page)
+            if len(page) < PAGE_SIZE:
+                return documents
+            offset += PAGE_SIZE
+
+    def _reindex_documents(self, log: SegmentLog, model_name: str, documents: list[dict], done: set[str]):
+        """Re-chunk and embed documents, appending to the log every REINDEX_BATCH_SIZE chunks."""
+        batch_docs, batch_chunks = [], []
+        # The new model; the live index keeps using its own until the swap
+        embedder = Embedder(model_name)
+
+        def flush():
+            if not batch_chunks:
+                return
+            with stage_timer("reindex_embed"):
+                embeddings = embedder.embed_texts([c["text"] for c in batch_chunks])
+            log.append(embeddings, batch_chunks, batch_docs)
+            done.update(batch_docs)
+            self.status["documents_done"] = len(done)
+            batch_docs.clear()
+            batch_chunks.clear()
+
+        for doc in documents:
+            try:
+                with stage_timer("reindex_extract"):
+                    text = process_file(resolve_upload(settings.UPLOAD_DIR, doc))
+                chunks = chunk_text(
+                    text,
+                    chunk_size=settings.CHUNK_SIZE,
+                    chunk_overlap=settings.CHUNK_OVERLAP,
+                    doc_id=doc["doc_id"],
+                    filename=doc["filename"],
+                )
+                if not chunks:
+                    raise ValueError("No text chunks could be created from this file.")
+            except Exception as e:
+                # e.g. the original file is gone — this holds back the swap
+                self.status["failed"][doc["doc_id"]] = str(e)
+                reindexed_documents_total.inc(status="failed")
+                print(f"[Reindexer] Skipping '{doc['filename']}' ({doc['doc_id']}): {e}")
+                continue
+
+            batch_docs.append(doc["doc_id"])
+            batch_chunks.extend(chunks)
+            reindexed_documents_total.inc(status="ok")
+            if len(batch_chunks) >= settings.REINDEX_BATCH_SIZE:
+                flush()
+        flush()
+
+    @staticmethod
+    def _write_chunk_counts(shadow: VectorStore):
+        """Record each document's new num_chunks, PAGE_SIZE documents per transaction."""
+        for shard in shadow.shards:
+            table = shard.table
+            # Counted straight from the doc codes; no chunk row is materialized
+            counts = np.bincount(table.doc_codes, minlength=len(table.doc_ids))
+            for start in range(0, len(table.doc_ids), PAGE_SIZE):
+                metadata_store.set_num_chunks({
+                    table.doc_ids[code]: int(counts[code])
+                    for code in range(start, min(start + PAGE_SIZE, len(table.doc_ids)))
+                })
+
+    def _swap(self, shadow: VectorStore, done: set[str]) -> bool:
+        """
+        Replace the live index with the shadow. Returns False without swapping if a
+        document was uploaded since the last sweep; the caller sweeps again.
+
+        The chunk counts are written first, in short transactions: if we crash
+        before the swap the index is still stale and the re-index simply runs again.
+        Only the final check and the directory swap hold the metadata write lock,
+        which keeps an upload from committing vectors for the old index in between.
+        """
+        self._write_chunk_counts(shadow)
+
+        with metadata_store.transaction():
+            live_ids = metadata_store.get_all_doc_ids()
+            if live_ids - done:
+                return False
+            old_model = self._store.embedding_model
+            self._store.swap_in(shadow)
+
+        # Documents deleted while the re-index was running; their metadata is already gone
+        for doc_id in done - live_ids:
+            self._store.delete_by_doc_id(doc_id)
+        shutil.rmtree(self._shadow_dir, ignore_errors=True)
+        if old_model != self._store.embedding_model:
+            Embedder.release(old_model)
+        return True
+
+
+# Global instance
+reindexer = Reindexer()
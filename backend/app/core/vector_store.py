@@ -1,123 +1,400 @@
 """
-Vector Store — NumPy-based in-memory vector store with cosine similarity search.
-Persists to disk as .npy (embeddings) + .json (metadata).
+Vector Store — sharded NumPy-based in-memory vector store with cosine similarity search.
+Chunks are partitioned across N shards by a hash of their doc_id. Each shard persists
+to its own .npy (embeddings) + .npz (columnar chunk metadata) files under DATA_DIR/index/.
+Search scans shards in parallel (NumPy releases the GIL) and merges per-shard top-k.
+The manifest records the embedding model and chunking parameters the index was built with.
 No external vector DB needed.
 """
 
 import os
 import json
+import heapq
+import shutil
+import threading
+import zlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from typing import Optional
 from app.config import settings
+from app.core.chunk_table import ChunkTable
+from app.utils.metrics import stage_timer, chunks_scanned_total
 
 
-class VectorStore:
+MANIFEST_VERSION = 1
+
+
+def _atomic_save_npy(path: str, array: np.ndarray):
+    """Write an .npy file via a temp file + rename so readers never see a partial file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _atomic_save_json(path: str, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class EmbeddingDimensionError(ValueError):
+    """Vectors whose dimension doesn't match the index they are added to or searched against."""
+
+
+def index_params() -> dict:
+    """Settings that determine the contents of an index; changing any of them requires a re-index."""
+    return {
+        "embedding_model": settings.EMBEDDING_MODEL,
+        "chunk_size": settings.CHUNK_SIZE,
+        "chunk_overlap": settings.CHUNK_OVERLAP,
+    }
+
+
+def shard_for_doc(doc_id: str, num_shards: int) -> int:
+    """Stable shard assignment — all chunks of a document live in the same shard."""
+    return zlib.crc32(doc_id.encode("utf-8")) % num_shards
+
+
+class Shard:
     """
-    Simple vector store using NumPy arrays.
-    Supports add, search, delete, save, and load operations.
+    One partition of the vector store: an embedding matrix plus its chunk metadata.
+    Keeps the inverse row norms alongside the matrix so search is a single mat-vec.
     """
 
-    def __init__(self):
+    def __init__(self, shard_id: int, shard_dir: str):
+        self.shard_id = shard_id
         self.embeddings: Optional[np.ndarray] = None  # shape: (n, dim)
-        self.chunks: list[dict] = []  # metadata for each embedding
-        self._embeddings_path = os.path.join(settings.DATA_DIR, "embeddings.npy")
-        self._chunks_path = os.path.join(settings.DATA_DIR, "chunks.json")
+        self.inv_norms: Optional[np.ndarray] = None  # shape: (n,)
+        self.table = ChunkTable()
+        self.dirty = False
+        self._dir = shard_dir
+        self._embeddings_path = os.path.join(shard_dir, "embeddings.npy")
+        self._table_path = os.path.join(shard_dir, "chunks.npz")
+        # Per-chunk dict layout written before the columnar table
+        self._legacy_chunks_path = os.path.join(shard_dir, "chunks.json")
+
+    @staticmethod
+    def _inverse_norms(embeddings: np.ndarray) -> np.ndarray:
+        return 1.0 / (np.linalg.norm(embeddings, axis=1) + 1e-10)
 
     def add(self, embeddings: np.ndarray, chunks: list[dict]):
-        """
-        Add embeddings and their corresponding chunk metadata.
-        embeddings: np.ndarray of shape (n, dim)
-        chunks: list of dicts with 'text', 'doc_id', 'filename', 'chunk_index'
-        """
+        inv_norms = self._inverse_norms(embeddings)
         if self.embeddings is None:
             self.embeddings = embeddings
+            self.inv_norms = inv_norms
         else:
             self.embeddings = np.vstack([self.embeddings, embeddings])
+            self.inv_norms = np.concatenate([self.inv_norms, inv_norms])
+        self.table = self.table.append(chunks)
+        self.dirty = True
 
-        self.chunks.extend(chunks)
-        self.save()
+    def set_contents(self, embeddings: np.ndarray, table: ChunkTable):
+        """Replace the shard's rows wholesale (e.g. when assembling a rebuilt index)."""
+        self.embeddings = embeddings
+        self.inv_norms = self._inverse_norms(embeddings)
+        self.table = table
+        self.dirty = True
 
-    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> list[dict]:
-        """
-        Find the top-k most similar chunks using cosine similarity.
-        Returns list of dicts: [{...chunk_metadata, "score": float}, ...]
-        """
-        if self.embeddings is None or len(self.chunks) == 0:
+    def snapshot(self) -> tuple:
+        """Capture a consistent (embeddings, inv_norms, table) view for lock-free scanning."""
+        return self.embeddings, self.inv_norms, self.table
+
+    def search(self, snapshot: tuple, query_norm: np.ndarray, top_k: int) -> list[tuple[float, int, int]]:
+        """Return the snapshot's top-k as (score, shard_id, row) tuples, best first."""
+        embeddings, inv_norms, _ = snapshot
+        if embeddings is None or len(embeddings) == 0:
             return []
 
-        # Cosine similarity: dot(a, b) / (||a|| * ||b||)
-        query_norm = query_embedding / (np.linalg.norm(query_embedding) + 1e-10)
-        emb_norms = self.embeddings / (
-            np.linalg.norm(self.embeddings, axis=1, keepdims=True) + 1e-10
-        )
-        similarities = np.dot(emb_norms, query_norm)
+        similarities = np.dot(embeddings, query_norm) * inv_norms
 
-        # Get top-k indices
+        # argpartition is O(n); only the k survivors get fully sorted
         top_k = min(top_k, len(similarities))
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        if top_k < len(similarities):
+            candidates = np.argpartition(-similarities, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(similarities))
+        top_indices = candidates[np.argsort(-similarities[candidates])]
 
-        results = []
-        for idx in top_indices:
-            result = {**self.chunks[idx], "score": float(similarities[idx])}
-            results.append(result)
-
-        return results
+        return [(float(similarities[i]), self.shard_id, int(i)) for i in top_indices]
 
     def delete_by_doc_id(self, doc_id: str) -> int:
-        """
-        Remove all chunks belonging to a specific document.
-        Returns the number of chunks removed.
-        """
-        if not self.chunks:
+        if not len(self.table):
             return 0
 
-        # Find indices to keep
-        keep_indices = [i for i, c in enumerate(self.chunks) if c.get("doc_id") != doc_id]
-        removed = len(self.chunks) - len(keep_indices)
+        doc_rows = self.table.rows_for_doc(doc_id)
+        removed = int(doc_rows.sum())
 
         if removed == 0:
             return 0
 
-        if keep_indices:
+        keep_indices = np.flatnonzero(~doc_rows)
+        if len(keep_indices):
             self.embeddings = self.embeddings[keep_indices]
-            self.chunks = [self.chunks[i] for i in keep_indices]
+            self.inv_norms = self.inv_norms[keep_indices]
+            self.table = self.table.take(keep_indices)
         else:
             self.embeddings = None
-            self.chunks = []
+            self.inv_norms = None
+            self.table = ChunkTable()
 
-        self.save()
+        self.dirty = True
         return removed
 
     def save(self):
-        """Persist embeddings and chunk metadata to disk."""
+        os.makedirs(self._dir, exist_ok=True)
         if self.embeddings is not None:
-            np.save(self._embeddings_path, self.embeddings)
+            _atomic_save_npy(self._embeddings_path, self.embeddings)
         elif os.path.exists(self._embeddings_path):
             os.remove(self._embeddings_path)
 
-        with open(self._chunks_path, "w", encoding="utf-8") as f:
-            json.dump(self.chunks, f, ensure_ascii=False, indent=2)
+        self.table.save(self._table_path)
+        if os.path.exists(self._legacy_chunks_path):
+            os.remove(self._legacy_chunks_path)
+        self.dirty = False
 
     def load(self):
-        """Load embeddings and chunk metadata from disk."""
         if os.path.exists(self._embeddings_path):
             self.embeddings = np.load(self._embeddings_path)
+            self.inv_norms = self._inverse_norms(self.embeddings)
         else:
             self.embeddings = None
+            self.inv_norms = None
 
-        if os.path.exists(self._chunks_path):
-            with open(self._chunks_path, "r", encoding="utf-8") as f:
-                self.chunks = json.load(f)
+        self.dirty = False
+        if os.path.exists(self._table_path):
+            self.table = ChunkTable.load(self._table_path)
+        elif os.path.exists(self._legacy_chunks_path):
+            with open(self._legacy_chunks_path, "r", encoding="utf-8") as f:
+                self.table = ChunkTable.from_dicts(json.load(f))
+            self.dirty = True
         else:
-            self.chunks = []
+            self.table = ChunkTable()
+
+
+class VectorStore:
+    """
+    Sharded vector store using NumPy arrays.
+    Supports add, search, delete, save, and load operations.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, num_shards: Optional[int] = None):
+        data_dir = data_dir or settings.DATA_DIR
+        self.num_shards = num_shards or settings.NUM_SHARDS
+        self._index_dir = os.path.join(data_dir, "index")
+        self._manifest_path = os.path.join(self._index_dir, "manifest.json")
+        # Pre-sharding layout, migrated on first load
+        self._legacy_embeddings_path = os.path.join(data_dir, "embeddings.npy")
+        self._legacy_chunks_path = os.path.join(data_dir, "chunks.json")
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.shards: list[Shard] = self._make_shards(self.num_shards)
+        self.index_params = index_params()
+        self.stale = False  # built with different index_params than the current settings
+
+    @property
+    def index_dir(self) -> str:
+        return self._index_dir
+
+    @property
+    def embedding_model(self) -> str:
+        """The model this index was built with — embed queries and new chunks with this one."""
+        return self.index_params["embedding_model"]
+
+    def _check_dim(self, dim: int, matrices) -> None:
+        for embeddings in matrices:
+            if embeddings is not None and embeddings.shape[1] != dim:
+                raise EmbeddingDimensionError(
+                    f"Embedding dimension {dim} does not match the index ({embeddings.shape[1]}, "
+                    f"built with '{self.embedding_model}')."
+                )
+
+    def _make_shards(self, num_shards: int) -> list[Shard]:
+        return [
+            Shard(i, os.path.join(self._index_dir, f"shard_{i:03d}"))
+            for i in range(num_shards)
+        ]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            workers = max(1, min(self.num_shards, settings.SEARCH_WORKERS))
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vs-search")
+        return self._executor
+
+    def _group_by_shard(self, chunks: list[dict]) -> dict[int, list[int]]:
+        groups: dict[int, list[int]] = {}
+        for i, chunk in enumerate(chunks):
+            shard_id = shard_for_doc(chunk.get("doc_id", ""), self.num_shards)
+            groups.setdefault(shard_id, []).append(i)
+        return groups
+
+    def add(self, embeddings: np.ndarray, chunks: list[dict]):
+        """
+        Add embeddings and their corresponding chunk metadata.
+        embeddings: np.ndarray of shape (n, dim)
+        chunks: list of dicts with 'text', 'doc_id', 'filename', 'chunk_index'
+        """
+        with self._lock:
+            self._check_dim(embeddings.shape[1], (s.embeddings for s in self.shards))
+            for shard_id, rows in self._group_by_shard(chunks).items():
+                self.shards[shard_id].add(embeddings[rows], [chunks[i] for i in rows])
+            self.save()
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> list[dict]:
+        """
+        Find the top-k most similar chunks using cosine similarity.
+        Each shard is scanned in the thread pool; the per-shard top-k lists are merged with a heap.
+        Returns list of dicts: [{...chunk_metadata, "score": float}, ...]
+        """
+        with self._lock:
+            # Snapshot under the lock so a concurrent add/delete can't shift rows under us
+            snapshots = {s.shard_id: (s, s.snapshot()) for s in self.shards if len(s.table)}
+
+        if not snapshots or top_k <= 0:
+            return []
+        self._check_dim(len(query_embedding), (snapshot[0] for _, snapshot in snapshots.values()))
+
+        query_norm = query_embedding / (np.linalg.norm(query_embedding) + 1e-10)
+        chunks_scanned_total.inc(sum(len(table) for _, (_, _, table) in snapshots.values()))
+
+        def scan(item):
+            shard, snapshot = item
+            return shard.search(snapshot, query_norm, top_k)
+
+        if len(snapshots) == 1:
+            per_shard = [scan(item) for item in snapshots.values()]
+        else:
+            per_shard = list(self._get_executor().map(scan, snapshots.values()))
+
+        # Each per-shard list is already sorted best-first, so a k-way heap merge suffices
+        best = islice(heapq.merge(*per_shard, key=lambda h: -h[0]), top_k)
+
+        results = []
+        for score, shard_id, row in best:
+            _, (_, _, table) = snapshots[shard_id]
+            result = {**table.row(row), "score": score}
+            results.append(result)
+
+        return results
+
+    def delete_by_doc_id(self, doc_id: str) -> int:
+        """
+        Remove all chunks belonging to a specific document.
+        Returns the number of chunks removed.
+        """
+        with self._lock:
+            removed = self.shards[shard_for_doc(doc_id, self.num_shards)].delete_by_doc_id(doc_id)
+            if removed:
+                self.save()
+            return removed
+
+    def save(self):
+        """Persist the manifest and every modified shard to disk."""
+        with self._lock, stage_timer("vector_store_save"):
+            os.makedirs(self._index_dir, exist_ok=True)
+            _atomic_save_json(self._manifest_path, {
+                "version": MANIFEST_VERSION,
+                "num_shards": self.num_shards,
+                "index_params": self.index_params,
+            })
+            for shard in self.shards:
+                if shard.dirty:
+                    shard.save()
+
+    def load(self):
+        """
+        Load all shards from disk, migrating the single-file layout if that is all there is.
+        Sets `stale` if the index was built with different model/chunking settings.
+        """
+        with self._lock:
+            self._recover_interrupted_swap()
+            self.index_params = index_params()
+            self.stale = False
+            if os.path.exists(self._manifest_path):
+                with open(self._manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                # Indexes written before parameters were tracked are assumed current
+                built_with = manifest.get("index_params")
+                if built_with is not None and built_with != self.index_params:
+                    print(f"[VectorStore] Index was built with {built_with}, settings are {self.index_params}.")
+                    self.index_params = built_with
+                    self.stale = True
+                num_shards = manifest.get("num_shards", self.num_shards)
+                if num_shards != settings.NUM_SHARDS:
+                    print(
+                        f"[VectorStore] Index on disk has {num_shards} shards "
+                        f"(NUM_SHARDS={settings.NUM_SHARDS}); keeping the on-disk layout."
+                    )
+                self._set_num_shards(num_shards)
+                for shard in self.shards:
+                    shard.load()
+                # Shards still in the per-chunk JSON layout are rewritten as columnar tables
+                if any(shard.dirty for shard in self.shards):
+                    self.save()
+            elif os.path.exists(self._legacy_chunks_path):
+                self._migrate_legacy()
+            else:
+                self._set_num_shards(self.num_shards)
+
+    def _recover_interrupted_swap(self):
+        old_dir = self._index_dir + ".old"
+        if not os.path.isdir(old_dir):
+            return
+        if os.path.isdir(self._index_dir):
+            shutil.rmtree(old_dir)
+        else:
+            os.replace(old_dir, self._index_dir)
+
+    def swap_in(self, shadow: "VectorStore"):
+        """
+        Replace this store's index with a fully built shadow index.
+        Under the store lock only the directories are renamed and the shadow's
+        in-memory shards adopted (no reload from disk), so searches see either the
+        old index or the new one, never a mix, and are held up only briefly.
+        """
+        shadow.save()
+        old_dir = self._index_dir + ".old"
+        with self._lock:
+            if os.path.isdir(self._index_dir):
+                os.replace(self._index_dir, old_dir)
+            os.replace(shadow.index_dir, self._index_dir)
+            self._set_num_shards(shadow.num_shards)
+            for shard, built in zip(self.shards, shadow.shards):
+                shard.embeddings, shard.inv_norms, shard.table = built.snapshot()
+            self.index_params = shadow.index_params
+            self.stale = shadow.stale
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def _set_num_shards(self, num_shards: int):
+        if num_shards != self.num_shards and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.num_shards = num_shards
+        self.shards = self._make_shards(num_shards)
+
+    def _migrate_legacy(self):
+        """Redistribute a pre-sharding embeddings.npy + chunks.json into shards."""
+        with open(self._legacy_chunks_path, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        self._set_num_shards(self.num_shards)
+        if chunks and os.path.exists(self._legacy_embeddings_path):
+            embeddings = np.load(self._legacy_embeddings_path)
+            for shard_id, rows in self._group_by_shard(chunks).items():
+                self.shards[shard_id].add(embeddings[rows], [chunks[i] for i in rows])
+        print(f"[VectorStore] Migrated {len(chunks)} chunks into {self.num_shards} shards.")
+        for shard in self.shards:
+            shard.dirty = True
+        self.save()
 
     @property
     def total_chunks(self) -> int:
-        return len(self.chunks)
+        return sum(len(s.table) for s in self.shards)
 
     def get_all_doc_ids(self) -> list[str]:
         """Get unique document IDs in the store."""
-        return list(set(c.get("doc_id", "") for c in self.chunks))
+        return list(set(doc_id for s in self.shards for doc_id in s.table.doc_ids))
 
 
 # Global instance
@@ -4,27 +4,44 @@ Sets up CORS, includes routers, and initializes the vector store on startup.
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
+from app.core.metadata_store import metadata_store
+from app.core.reindexer import reindexer
 from app.core.vector_store import vector_store
-from app.utils import ollama_client
+from app.utils import ollama_client, metrics
 from app.models import HealthResponse
-from app.routers import documents, query
+from app.routers import documents, query, index
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load vector store from disk on startup."""
+    """Load vector store from disk on startup, re-indexing in the background if settings changed."""
     print("[Startup] Loading vector store from disk...")
     vector_store.load()
+    _drop_orphan_chunks()
     print(f"[Startup] Vector store loaded: {vector_store.total_chunks} chunks")
+    reindexer.start_if_needed()
     yield
     print("[Shutdown] Saving vector store...")
     vector_store.save()
+    metadata_store.close()
     print("[Shutdown] Done.")
 
 
+def _drop_orphan_chunks():
+    """
+    Remove vectors whose document never committed to the metadata store
+    (e.g. a crash between the vector save and the metadata commit).
+    """
+    orphans = set(vector_store.get_all_doc_ids()) - metadata_store.get_all_doc_ids()
+    for doc_id in orphans:
+        removed = vector_store.delete_by_doc_id(doc_id)
+        print(f"[Startup] Dropped {removed} orphaned chunks for document '{doc_id}'")
+
+
 app = FastAPI(
     title="RAG System API",
     description="A Retrieval-Augmented Generation system built from scratch with Python — no LangChain or LlamaIndex.",
@@ -39,11 +56,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
+# Multipart framing overhead allowed on top of MAX_UPLOAD_BYTES
+UPLOAD_FRAMING_BYTES = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse uploads whose declared Content-Length is over the limit before the body is read."""
+    if request.url.path == "/api/documents/upload":
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and \
+                int(content_length) > settings.MAX_UPLOAD_BYTES + UPLOAD_FRAMING_BYTES:
+            metrics.uploads_total.inc(status="too_large")
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB."},
+            )
+    return await call_next(request)
+
+
 # Routers
 app.include_router(documents.router)
 app.include_router(query.router)
+app.include_router(index.router)
 
 
 @app.get("/api/health", response_model=HealthResponse)
@@ -53,6 +91,12 @@ async def health_check():
     return HealthResponse(
         status="ok",
         ollama=ollama_status,
-        total_documents=len(vector_store.get_all_doc_ids()),
+        total_documents=metadata_store.count_documents(),
         total_chunks=vector_store.total_chunks,
     )
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Pipeline latency histograms, counters and gauges in Prometheus text format."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -9,6 +9,7 @@ from typing import Optional
 class QueryRequest(BaseModel):
     question: str
     top_k: Optional[int] = None
+    include_timings: bool = False
 
 
 class SourceInfo(BaseModel):
@@ -23,6 +24,7 @@ class QueryResponse(BaseModel):
     sources: list[SourceInfo]
     num_chunks_searched: int
     error: Optional[str] = None
+    timings: Optional[dict[str, float]] = None  # per-stage milliseconds, if requested
 
 
 class DocumentInfo(BaseModel):
@@ -46,6 +48,13 @@ class DeleteResponse(BaseModel):
     chunks_removed: int
 
 
+class IndexStatusResponse(BaseModel):
+    stale: bool
+    index_params: dict
+    current_params: dict
+    reindex: dict
+
+
 class HealthResponse(BaseModel):
     status: str
     ollama: dict
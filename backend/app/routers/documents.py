@@ -4,33 +4,20 @@ Document management endpoints — upload, list, and delete documents.
 
 import os
 import uuid
-import json
 from datetime import datetime
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
 from app.config import settings
 from app.core.document_processor import process_file
 from app.core.chunker import chunk_text
-from app.core.embedder import embedder
+from app.core.embedder import Embedder
+from app.core.metadata_store import metadata_store
 from app.core.vector_store import vector_store
 from app.models import UploadResponse, DocumentInfo, DeleteResponse
+from app.utils.uploads import stream_to_disk, upload_path, resolve_upload, UploadTooLargeError
+from app.utils.metrics import stage_timer, cache_requests_total, uploads_total, chunks_indexed_total
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
 
-# Simple metadata store for uploaded documents
-DOCS_META_PATH = os.path.join(settings.DATA_DIR, "documents_meta.json")
-
-
-def _load_docs_meta() -> dict:
-    if os.path.exists(DOCS_META_PATH):
-        with open(DOCS_META_PATH, "r") as f:
-            return json.load(f)
-    return {}
-
-
-def _save_docs_meta(meta: dict):
-    with open(DOCS_META_PATH, "w") as f:
-        json.dump(meta, f, indent=2)
-
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_document(file: UploadFile = File(...)):
@@ -45,57 +32,107 @@ async def upload_document(file: UploadFile = File(...)):
             detail=f"Unsupported file type: {ext}. Allowed: {list(allowed_extensions)}"
         )
 
-    # Generate unique doc ID
-    doc_id = str(uuid.uuid4())[:8]
+    # Reject early when the size is already known
+    if file.size is not None and file.size > settings.MAX_UPLOAD_BYTES:
+        uploads_total.inc(status="too_large")
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB.",
+        )
 
-    # Save uploaded file to disk
-    file_path = os.path.join(settings.UPLOAD_DIR, f"{doc_id}_{file.filename}")
+    # Stream the upload to a temp file in UPLOAD_DIR, hashing as we go
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        with stage_timer("upload_stream"):
+            temp_path, _, content_hash = await stream_to_disk(
+                file,
+                settings.UPLOAD_DIR,
+                max_bytes=settings.MAX_UPLOAD_BYTES,
+                chunk_bytes=settings.UPLOAD_CHUNK_BYTES,
+            )
+    except UploadTooLargeError as e:
+        uploads_total.inc(status="too_large")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
+        uploads_total.inc(status="error")
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
+    # Identical content already indexed — nothing to do
+    existing = metadata_store.find_by_hash(content_hash)
+    cache_requests_total.inc(cache="upload_dedup", result="hit" if existing else "miss")
+    if existing is not None:
+        os.remove(temp_path)
+        uploads_total.inc(status="duplicate")
+        return UploadResponse(
+            message=f"Document '{file.filename}' is identical to '{existing['filename']}', which is already uploaded.",
+            doc_id=existing["doc_id"],
+            filename=existing["filename"],
+            num_chunks=existing["num_chunks"],
+            total_chunks_in_store=vector_store.total_chunks,
+        )
+
+    # Generate unique doc ID and move the finished file into place
+    doc_id = str(uuid.uuid4())[:8]
+    file_path = upload_path(settings.UPLOAD_DIR, doc_id, file.filename)
+    os.replace(temp_path, file_path)
+
     # Extract text
     try:
-        text = process_file(file_path)
+        with stage_timer("extract"):
+            text = process_file(file_path)
     except ValueError as e:
         os.remove(file_path)
+        uploads_total.inc(status="invalid")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         os.remove(file_path)
+        uploads_total.inc(status="error")
         raise HTTPException(status_code=500, detail=f"Failed to process file: {str(e)}")
 
     # Chunk the text
-    chunks = chunk_text(
-        text,
-        chunk_size=settings.CHUNK_SIZE,
-        chunk_overlap=settings.CHUNK_OVERLAP,
-        doc_id=doc_id,
-        filename=file.filename,
-    )
+    with stage_timer("chunk"):
+        chunks = chunk_text(
+            text,
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            doc_id=doc_id,
+            filename=file.filename,
+        )
 
     if not chunks:
         os.remove(file_path)
+        uploads_total.inc(status="invalid")
         raise HTTPException(status_code=400, detail="No text chunks could be created from this file.")
 
-    # Embed the chunks
+    # Embed the chunks with the live index's model (not EMBEDDING_MODEL, while a re-index is pending)
     texts_to_embed = [c["text"] for c in chunks]
-    embeddings = embedder.embed_texts(texts_to_embed)
-
-    # Add to vector store
-    vector_store.add(embeddings, chunks)
+    model_name = vector_store.embedding_model
+    try:
+        with stage_timer("embed_texts"):
+            embeddings = Embedder(model_name).embed_texts(texts_to_embed)
+
+        # Save document metadata and add to vector store in one transaction:
+        # the metadata only commits once the vectors have been persisted
+        with stage_timer("index"), metadata_store.transaction():
+            if vector_store.embedding_model != model_name:
+                # A re-index swapped in a new model while we were embedding
+                embeddings = Embedder(vector_store.embedding_model).embed_texts(texts_to_embed)
+            metadata_store.add_document(
+                doc_id=doc_id,
+                filename=file.filename,
+                file_path=file_path,
+                num_chunks=len(chunks),
+                upload_time=datetime.now().isoformat(),
+                content_hash=content_hash,
+            )
+            vector_store.add(embeddings, chunks)
+    except Exception as e:
+        # The transaction rolled back, so nothing references the file
+        os.remove(file_path)
+        uploads_total.inc(status="error")
+        raise HTTPException(status_code=500, detail=f"Failed to index document: {str(e)}")
 
-    # Save document metadata
-    docs_meta = _load_docs_meta()
-    docs_meta[doc_id] = {
-        "filename": file.filename,
-        "file_path": file_path,
-        "num_chunks": len(chunks),
-        "upload_time": datetime.now().isoformat(),
-    }
-    _save_docs_meta(docs_meta)
+    uploads_total.inc(status="ok")
+    chunks_indexed_total.inc(len(chunks))
 
     return UploadResponse(
         message=f"Document '{file.filename}' uploaded and processed successfully.",
@@ -107,42 +144,43 @@ async def upload_document(file: UploadFile = File(...)):
 
 
 @router.get("/", response_model=list[DocumentInfo])
-async def list_documents():
-    """List all uploaded documents."""
-    docs_meta = _load_docs_meta()
-    documents = []
-    for doc_id, meta in docs_meta.items():
-        documents.append(
-            DocumentInfo(
-                doc_id=doc_id,
-                filename=meta["filename"],
-                num_chunks=meta["num_chunks"],
-                upload_time=meta.get("upload_time"),
-            )
+async def list_documents(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """List uploaded documents, one page at a time. The total count is in the X-Total-Count header."""
+    response.headers["X-Total-Count"] = str(metadata_store.count_documents())
+    return [
+        DocumentInfo(
+            doc_id=meta["doc_id"],
+            filename=meta["filename"],
+            num_chunks=meta["num_chunks"],
+            upload_time=meta.get("upload_time"),
         )
-    return documents
+        for meta in metadata_store.list_documents(offset=offset, limit=limit)
+    ]
 
 
 @router.delete("/{doc_id}", response_model=DeleteResponse)
 async def delete_document(doc_id: str):
     """Delete a document and remove its chunks from the vector store."""
-    docs_meta = _load_docs_meta()
+    meta = metadata_store.get_document(doc_id)
 
-    if doc_id not in docs_meta:
+    if meta is None:
         raise HTTPException(status_code=404, detail=f"Document '{doc_id}' not found.")
 
-    # Remove from vector store
+    # Commit the metadata delete before touching the vectors: a crash in between can
+    # only leave orphan vectors, which are dropped on the next startup
+    metadata_store.delete_document(doc_id)
     chunks_removed = vector_store.delete_by_doc_id(doc_id)
 
     # Delete the file from disk
-    file_path = docs_meta[doc_id].get("file_path", "")
-    if file_path and os.path.exists(file_path):
+    file_path = resolve_upload(settings.UPLOAD_DIR, meta)
+    if os.path.exists(file_path):
         os.remove(file_path)
 
-    # Remove from metadata
-    filename = docs_meta[doc_id]["filename"]
-    del docs_meta[doc_id]
-    _save_docs_meta(docs_meta)
+    filename = meta["filename"]
 
     return DeleteResponse(
         message=f"Document '{filename}' deleted successfully.",
@@ -0,0 +1,33 @@
+"""
+Index management endpoints — re-index status and manual trigger.
+"""
+
+from fastapi import APIRouter, HTTPException
+from app.core.reindexer import reindexer
+from app.core.vector_store import vector_store, index_params
+from app.models import IndexStatusResponse
+
+router = APIRouter(prefix="/api/index", tags=["Index"])
+
+
+def _status() -> IndexStatusResponse:
+    return IndexStatusResponse(
+        stale=vector_store.stale,
+        index_params=vector_store.index_params,
+        current_params=index_params(),
+        reindex=reindexer.status,
+    )
+
+
+@router.get("/status", response_model=IndexStatusResponse)
+async def index_status():
+    """Which settings the live index was built with, and the progress of any re-index."""
+    return _status()
+
+
+@router.post("/reindex", response_model=IndexStatusResponse, status_code=202)
+async def start_reindex():
+    """Rebuild the index from the original uploads in the background, using the current settings."""
+    if not reindexer.start():
+        raise HTTPException(status_code=409, detail="A re-index is already running.")
+    return _status()
@@ -5,6 +5,7 @@ Query endpoint — accepts a question and returns RAG-generated answer.
 from fastapi import APIRouter
 from app.models import QueryRequest, QueryResponse
 from app.core import rag_pipeline
+from app.utils.metrics import collect_timings
 
 router = APIRouter(prefix="/api", tags=["Query"])
 
@@ -17,15 +18,18 @@ async def ask_question(request: QueryRequest):
     1. Embed the question
     2. Retrieve relevant chunks
     3. Generate an answer using Ollama
+    Set `include_timings` to get a per-stage latency breakdown (ms) in the response.
     """
-    result = await rag_pipeline.query(
-        question=request.question,
-        top_k=request.top_k,
-    )
+    with collect_timings() as timings:
+        result = await rag_pipeline.query(
+            question=request.question,
+            top_k=request.top_k,
+        )
 
     return QueryResponse(
         answer=result["answer"],
         sources=result.get("sources", []),
         num_chunks_searched=result.get("num_chunks_searched", 0),
         error=result.get("error"),
+        timings=timings if request.include_timings else None,
     )
@@ -0,0 +1,195 @@
+"""
+Metrics — lightweight counters, gauges and histograms with Prometheus text exposition.
+No prometheus_client dependency; just enough to expose /api/metrics.
+
+`stage_timer(stage)` times a pipeline stage into the `rag_stage_duration_seconds`
+histogram and, inside a `collect_timings()` block, into a per-request breakdown.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+_registry: list["_Metric"] = []
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return super().render() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; quantiles are derived server-side with histogram_quantile()."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [bucket_counts, sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+        lines = super().render()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render_prometheus() -> str:
+    """All registered metrics in Prometheus text exposition format (v0.0.4)."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics exported by the app ---
+
+stage_duration = Histogram(
+    "rag_stage_duration_seconds", "Time spent in each pipeline stage.", ("stage",),
+)
+queries_total = Counter(
+    "rag_queries_total", "RAG queries handled, by outcome.", ("status",),
+)
+chunks_scanned_total = Counter(
+    "rag_chunks_scanned_total", "Chunks scored by vector store searches.",
+)
+prompt_chars = Histogram(
+    "rag_prompt_chars", "Size of prompts sent to the LLM, in characters.", buckets=SIZE_BUCKETS,
+)
+generations_in_flight = Gauge(
+    "rag_generations_in_flight", "LLM generations currently awaiting a response.",
+)
+cache_requests_total = Counter(
+    "rag_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"),
+)
+uploads_total = Counter(
+    "rag_uploads_total", "Document uploads, by outcome.", ("status",),
+)
+chunks_indexed_total = Counter(
+    "rag_chunks_indexed_total", "Chunks embedded and added to the vector store.",
+)
+
+
+# --- Per-request timing breakdown ---
+
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Collect every stage_timer() inside this block into a {stage: milliseconds} dict."""
+    timings: dict[str, float] = {}
+    token = _request_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings["total"] = round((time.perf_counter() - start) * 1000, 3)
+        _request_timings.reset(token)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a pipeline stage into the stage histogram and the active request breakdown."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_duration.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed * 1000, 3)
@@ -0,0 +1,71 @@
+"""
+Upload storage — streams an incoming upload to disk in fixed-size blocks.
+Enforces a size limit while reading and hashes the content on the fly,
+so no upload is ever held in memory in full.
+"""
+
+import os
+import ntpath
+import hashlib
+import tempfile
+from fastapi import UploadFile
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+def upload_path(upload_dir: str, doc_id: str, filename: str) -> str:
+    """Where a document's original file is kept: `{doc_id}_{filename}` in upload_dir."""
+    return os.path.join(upload_dir, f"{doc_id}_{filename}")
+
+
+def resolve_upload(upload_dir: str, doc: dict) -> str:
+    """
+    Locate a stored document's original file under upload_dir.
+    The recorded file_path is absolute and may come from another machine or OS
+    (e.g. a Windows path in migrated metadata), so only its basename is trusted.
+    """
+    path = upload_path(upload_dir, doc["doc_id"], doc["filename"])
+    if not os.path.exists(path) and doc.get("file_path"):
+        # ntpath.basename splits on both "\\" and "/"
+        fallback = os.path.join(upload_dir, ntpath.basename(doc["file_path"]))
+        if os.path.exists(fallback):
+            return fallback
+    return path
+
+
+async def stream_to_disk(
+    file: UploadFile,
+    dest_dir: str,
+    max_bytes: int,
+    chunk_bytes: int = 1024 * 1024,
+) -> tuple[str, int, str]:
+    """
+    Copy an upload into a temp file inside dest_dir, `chunk_bytes` at a time.
+    The temp file lives in dest_dir so the caller can os.replace() it into place atomically.
+
+    Returns (temp_path, size_in_bytes, sha256_hexdigest).
+    Raises UploadTooLargeError (and removes the temp file) once more than max_bytes is read.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".part")
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = await file.read(chunk_bytes)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"File exceeds the maximum upload size of {max_bytes // (1024 * 1024)} MB."
+                    )
+                hasher.update(block)
+                out.write(block)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return temp_path, size, hasher.hexdigest()
@@ -0,0 +1,78 @@
+"""
+Benchmark — memory per chunk for chunk metadata.
+
+Compares the per-chunk dict list (as json.load produced it from chunks.json)
+against the columnar ChunkTable, using tracemalloc to count Python-heap and
+NumPy allocations.
+
+Usage (from backend/):
+    python -m benchmarks.bench_chunk_memory --chunks 200000 --chunks-per-doc 50
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from app.core.chunk_table import ChunkTable
+
+
+WORDS = "the of and to in is that for it as with was on be by this are from at or an".split()
+
+
+def synthetic_chunks_json(num_chunks: int, chunks_per_doc: int, chunk_chars: int, seed: int) -> str:
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(num_chunks):
+        text = " ".join(rng.choice(WORDS) for _ in range(chunk_chars // 3))[:chunk_chars]
+        doc = i // chunks_per_doc
+        chunks.append({
+            "text": text,
+            "doc_id": f"{doc:08x}",
+            "filename": f"document_{doc}.pdf",
+            "chunk_index": i % chunks_per_doc,
+        })
+    return json.dumps(chunks)
+
+
+def measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--chunks-per-doc", type=int, default=50)
+    parser.add_argument("--chunk-chars", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    raw = synthetic_chunks_json(args.chunks, args.chunks_per_doc, args.chunk_chars, args.seed)
+
+    dicts, dict_bytes = measure(lambda: json.loads(raw))
+    table, table_bytes = measure(lambda: ChunkTable.from_dicts(dicts))
+    del dicts, table
+
+    result = {
+        "benchmark": "chunk_metadata_memory",
+        "chunks": args.chunks,
+        "chunks_per_doc": args.chunks_per_doc,
+        "chunk_chars": args.chunk_chars,
+        "dicts_bytes_per_chunk": round(dict_bytes / args.chunks, 1),
+        "columnar_bytes_per_chunk": round(table_bytes / args.chunks, 1),
+        "reduction": round(dict_bytes / table_bytes, 2),
+    }
+    print(result, file=sys.stderr)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
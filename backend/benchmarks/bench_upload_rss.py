@@ -0,0 +1,107 @@
+"""
+Benchmark — peak RSS while saving concurrent large uploads.
+
+Compares the old `await file.read()` + write approach against `stream_to_disk`.
+Each mode runs in a fresh subprocess so ru_maxrss (a process-lifetime high-water mark)
+only reflects that mode.
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload_rss --uploads 8 --size-mb 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from fastapi import UploadFile
+from app.utils.uploads import stream_to_disk
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _read_all(file: UploadFile, dest_dir: str):
+    """The pre-streaming implementation."""
+    content = await file.read()
+    with open(os.path.join(dest_dir, file.filename), "wb") as f:
+        f.write(content)
+
+
+async def _stream(file: UploadFile, dest_dir: str):
+    await stream_to_disk(file, dest_dir, max_bytes=sys.maxsize)
+
+
+def run_mode(mode: str, uploads: int, size_mb: int) -> dict:
+    handler = {"read_all": _read_all, "stream": _stream}[mode]
+    with tempfile.TemporaryDirectory() as work_dir:
+        src_dir = os.path.join(work_dir, "src")
+        dest_dir = os.path.join(work_dir, "dest")
+        os.makedirs(src_dir)
+        os.makedirs(dest_dir)
+
+        # Source files are written block by block so creating them doesn't raise the peak
+        block = os.urandom(1024 * 1024)
+        paths = []
+        for i in range(uploads):
+            path = os.path.join(src_dir, f"upload_{i}.pdf")
+            with open(path, "wb") as f:
+                for _ in range(size_mb):
+                    f.write(block)
+            paths.append(path)
+
+        baseline = _peak_rss_mb()
+        files = [UploadFile(open(p, "rb"), filename=os.path.basename(p)) for p in paths]
+
+        async def run_all():
+            await asyncio.gather(*(handler(f, dest_dir) for f in files))
+
+        asyncio.run(run_all())
+        for f in files:
+            f.file.close()
+
+        peak = _peak_rss_mb()
+    return {
+        "mode": mode,
+        "uploads": uploads,
+        "size_mb": size_mb,
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak, 1),
+        "delta_rss_mb": round(peak - baseline, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--mode", choices=["read_all", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        # Child process: run one mode and report
+        json.dump(run_mode(args.mode, args.uploads, args.size_mb), sys.stdout)
+        return
+
+    results = []
+    for mode in ("read_all", "stream"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_upload_rss", "--mode", mode,
+             "--uploads", str(args.uploads), "--size-mb", str(args.size_mb)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        row = json.loads(out)
+        results.append(row)
+        print(row, file=sys.stderr)
+
+    json.dump({"benchmark": "upload_peak_rss", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
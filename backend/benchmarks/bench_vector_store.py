@@ -0,0 +1,86 @@
+"""
+Benchmark — vector store query latency vs shard count.
+
+Builds an in-memory store of random unit vectors for each corpus size and shard count,
+then times `VectorStore.search`. Nothing is written to DATA_DIR.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_store --sizes 100000,1000000 --shards 1,2,4,8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from app.core.vector_store import VectorStore
+
+
+def build_store(embeddings: np.ndarray, num_shards: int, data_dir: str) -> VectorStore:
+    """Populate a store directly, skipping the per-add save to disk."""
+    n = len(embeddings)
+    chunks = [
+        {"text": f"chunk {i}", "doc_id": f"doc{i // 100}", "filename": "synthetic.txt", "chunk_index": i % 100}
+        for i in range(n)
+    ]
+    store = VectorStore(data_dir=data_dir, num_shards=num_shards)
+    for shard_id, rows in store._group_by_shard(chunks).items():
+        store.shards[shard_id].add(embeddings[rows], [chunks[i] for i in rows])
+    return store
+
+
+def time_queries(store: VectorStore, queries: np.ndarray, top_k: int) -> dict:
+    store.search(queries[0], top_k=top_k)  # warm up the thread pool
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        store.search(q, top_k=top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    return {
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "qps": round(float(1000 / latencies.mean()), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    results = []
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in (int(s) for s in args.sizes.split(",")):
+            embeddings = rng.standard_normal((size, args.dim)).astype(np.float32)
+            for num_shards in (int(s) for s in args.shards.split(",")):
+                store = build_store(embeddings, num_shards, data_dir)
+                row = {"chunks": size, "shards": num_shards, **time_queries(store, queries, args.top_k)}
+                results.append(row)
+                print(row, file=sys.stderr)
+                del store
+            del embeddings
+
+    json.dump({
+        "benchmark": "vector_store_search",
+        "dim": args.dim,
+        "top_k": args.top_k,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
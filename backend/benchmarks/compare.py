@@ -0,0 +1,76 @@
+"""
+Compare two benchmark JSON reports from `benchmarks.run`.
+
+Walks both reports' "stages", pairs up every latency (`*_ms`, lower is better)
+and rate (`*_per_s`, `qps`, higher is better) metric, and prints the change.
+Exits non-zero if any metric regressed by more than --threshold percent.
+
+Usage (from backend/):
+    python -m benchmarks.compare base.json new.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def flatten(node, prefix: str = "") -> dict[str, float]:
+    """Flatten nested dicts/lists to {"stage.sub.metric": value}; list items are keyed by their size."""
+    out = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            out.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(node, list):
+        for i, item in enumerate(node):
+            label = item.get("chunks", i) if isinstance(item, dict) else i
+            out.update(flatten(item, f"{prefix}[{label}]"))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        out[prefix] = float(node)
+    return out
+
+
+def direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if not a performance metric."""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith("_ms"):
+        return -1
+    if name.endswith("_per_s") or name == "qps":
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    base_metrics = flatten(base["stages"])
+    new_metrics = flatten(new["stages"])
+
+    print(f"base {base['meta'].get('commit')}  ->  new {new['meta'].get('commit')}")
+    regressions = 0
+    for metric in sorted(base_metrics.keys() & new_metrics.keys()):
+        sign = direction(metric)
+        old, cur = base_metrics[metric], new_metrics[metric]
+        if sign == 0 or old == 0:
+            continue
+        change = (cur - old) / old * 100
+        regressed = sign * change < -args.threshold
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{metric:50s} {old:12.3f} {cur:12.3f} {change:+8.1f}%{flag}")
+
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
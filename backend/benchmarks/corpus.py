@@ -0,0 +1,114 @@
+"""
+Synthetic corpus generator for benchmarks.
+Produces deterministic pseudo-English documents and writes them as TXT, DOCX or PDF.
+"""
+
+import os
+import random
+from docx import Document
+
+
+WORDS = (
+    "system data model query document vector index search memory process file "
+    "network server client request response cache latency throughput storage "
+    "embedding chunk token context answer source retrieval pipeline shard table "
+    "the of and to in is that for it as with was on be by this are from at or an"
+).split()
+
+
+def make_sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "?", "!"])
+
+
+def make_document(rng: random.Random, num_chars: int) -> str:
+    """A document of roughly num_chars characters split into paragraphs."""
+    paragraphs, size = [], 0
+    while size < num_chars:
+        paragraph = " ".join(make_sentence(rng) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def make_corpus(num_docs: int, doc_chars: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [make_document(rng, doc_chars) for _ in range(num_docs)]
+
+
+def make_queries(num_queries: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    return [make_sentence(rng) for _ in range(num_queries)]
+
+
+def write_txt(text: str, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(text: str, path: str):
+    doc = Document()
+    for paragraph in text.split("\n\n"):
+        doc.add_paragraph(paragraph)
+    doc.save(path)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(text: str, path: str, lines_per_page: int = 50, line_chars: int = 90):
+    """Write a minimal single-font PDF (Helvetica, one text stream per page)."""
+    lines = []
+    for paragraph in text.split("\n\n"):
+        while paragraph:
+            lines.append(paragraph[:line_chars])
+            paragraph = paragraph[line_chars:]
+        lines.append("")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 pages, 3 font, then (page, contents) pairs
+    objects = {}
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_num, content_num = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_num} 0 R")
+        stream = "BT /F1 10 Tf 12 TL 50 790 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        objects[page_num] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_num} 0 R >>"
+        )
+        objects[content_num] = f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream"
+    objects[1] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+    objects[3] = "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += f"{num} 0 obj\n{objects[num]}\nendobj\n".encode("latin-1")
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for num in sorted(objects):
+        out += f"{offsets[num]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+WRITERS = {".txt": write_txt, ".docx": write_docx, ".pdf": write_pdf}
+
+
+def write_corpus(texts: list[str], out_dir: str, ext: str) -> list[str]:
+    """Write every text as a file of the given type; returns the file paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, text in enumerate(texts):
+        path = os.path.join(out_dir, f"doc_{i:05d}{ext}")
+        WRITERS[ext](text, path)
+        paths.append(path)
+    return paths
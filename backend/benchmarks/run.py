@@ -0,0 +1,328 @@
+"""
+End-to-end benchmark suite for the RAG backend.
+
+Measures, on a synthetic corpus:
+  extract    process_file on TXT / DOCX / PDF
+  chunk      chunk_text
+  embed      Embedder.embed_texts (SBERT, or a hashing embedder with --embedder hash)
+  add        VectorStore.add (including its save)
+  save/load  VectorStore.save / VectorStore.load
+  search     VectorStore.search at several corpus sizes
+  query      POST /api/query end-to-end against a local stub Ollama server
+
+Everything runs against a temporary DATA_DIR / UPLOAD_DIR; the real data is never touched.
+Results are written as JSON; compare two runs with `python -m benchmarks.compare`.
+
+Usage (from backend/):
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --quick --embedder hash
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+import numpy as np
+
+from benchmarks import corpus
+from benchmarks.stub_ollama import StubOllama
+
+
+def stats(samples_s: list[float]) -> dict:
+    """Latency summary in milliseconds."""
+    ms = np.array(samples_s) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "min_ms": round(float(ms.min()), 3),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def log(message: str):
+    print(f"[bench] {message}", file=sys.stderr, flush=True)
+
+
+class HashEmbeddingModel:
+    """
+    Deterministic hashed bag-of-words embedder with the SentenceTransformer
+    `encode` interface. Lets the rest of the pipeline be benchmarked without
+    downloading a model; embedding numbers from it say nothing about SBERT.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, **kwargs) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                h = zlib.crc32(word.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return out
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+
+def bench_extract(texts: list[str], work_dir: str) -> dict:
+    from app.core.document_processor import process_file
+
+    results = {}
+    for ext in (".txt", ".docx", ".pdf"):
+        paths = corpus.write_corpus(texts, os.path.join(work_dir, ext.strip(".")), ext)
+        samples, total_bytes = [], 0
+        for path in paths:
+            _, elapsed = timed(process_file, path)
+            samples.append(elapsed)
+            total_bytes += os.path.getsize(path)
+        results[ext.strip(".")] = {
+            **stats(samples),
+            "mb_per_s": round(total_bytes / 1e6 / sum(samples), 2),
+        }
+        log(f"extract {ext}: {results[ext.strip('.')]['mean_ms']} ms/doc")
+    return results
+
+
+def bench_chunk(texts: list[str]) -> tuple[list[list[dict]], dict]:
+    from app.config import settings
+    from app.core.chunker import chunk_text
+
+    per_doc, samples = [], []
+    for i, text in enumerate(texts):
+        chunks, elapsed = timed(
+            chunk_text, text,
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            doc_id=f"{i:08x}",
+            filename=f"doc_{i:05d}.txt",
+        )
+        per_doc.append(chunks)
+        samples.append(elapsed)
+    total_chunks = sum(len(c) for c in per_doc)
+    total_chars = sum(len(t) for t in texts)
+    result = {
+        **stats(samples),
+        "chunks": total_chunks,
+        "mb_per_s": round(total_chars / 1e6 / sum(samples), 2),
+    }
+    log(f"chunk: {total_chunks} chunks, {result['mean_ms']} ms/doc")
+    return per_doc, result
+
+
+def bench_embed(per_doc_chunks: list[list[dict]]) -> tuple[list[np.ndarray], dict]:
+    from app.core.embedder import embedder
+
+    embedder.embed_texts(["warm up"])
+    per_doc, samples = [], []
+    for chunks in per_doc_chunks:
+        embeddings, elapsed = timed(embedder.embed_texts, [c["text"] for c in chunks])
+        per_doc.append(embeddings)
+        samples.append(elapsed)
+    total_chunks = sum(len(c) for c in per_doc_chunks)
+    result = {
+        **stats(samples),
+        "chunks_per_s": round(total_chunks / sum(samples), 1),
+        "dim": int(per_doc[0].shape[1]),
+    }
+    log(f"embed: {result['chunks_per_s']} chunks/s")
+    return per_doc, result
+
+
+def bench_add(store, per_doc_chunks: list[list[dict]], per_doc_embeddings: list[np.ndarray]) -> dict:
+    samples = []
+    for chunks, embeddings in zip(per_doc_chunks, per_doc_embeddings):
+        _, elapsed = timed(store.add, embeddings, chunks)
+        samples.append(elapsed)
+    result = {**stats(samples), "docs_per_s": round(len(samples) / sum(samples), 1)}
+    log(f"add: {result['mean_ms']} ms/doc")
+    return result
+
+
+def bench_save_load(store, repeats: int) -> dict:
+    from app.core.vector_store import VectorStore
+
+    save_samples, load_samples = [], []
+    for _ in range(repeats):
+        for shard in store.shards:
+            shard.dirty = True
+        _, elapsed = timed(store.save)
+        save_samples.append(elapsed)
+
+        fresh = VectorStore()
+        _, elapsed = timed(fresh.load)
+        load_samples.append(elapsed)
+    result = {"chunks": store.total_chunks, "save": stats(save_samples), "load": stats(load_samples)}
+    log(f"save: {result['save']['mean_ms']} ms, load: {result['load']['mean_ms']} ms")
+    return result
+
+
+def bench_search(sizes: list[int], dim: int, num_queries: int, top_k: int, num_shards: int, work_dir: str) -> list[dict]:
+    from benchmarks.bench_vector_store import build_store, time_queries
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((num_queries, dim)).astype(np.float32)
+    results = []
+    for size in sizes:
+        embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+        store = build_store(embeddings, num_shards, work_dir)
+        row = {"chunks": size, "shards": num_shards, **time_queries(store, queries, top_k)}
+        results.append(row)
+        log(f"search @ {size}: {row['mean_ms']} ms")
+        del store, embeddings
+    return results
+
+
+async def bench_query(questions: list[str], requests: int, concurrency: int) -> dict:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+        errors = 0
+
+        async def ask(question: str) -> float:
+            nonlocal errors
+            start = time.perf_counter()
+            response = await client.post("/api/query", json={"question": question})
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200 or response.json().get("error"):
+                errors += 1
+            return elapsed
+
+        await ask(questions[0])
+
+        # Latency: one request at a time
+        sequential = [await ask(questions[i % len(questions)]) for i in range(requests)]
+
+        # Throughput: `concurrency` requests in flight
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(question: str) -> float:
+            async with semaphore:
+                return await ask(question)
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*(bounded(questions[i % len(questions)]) for i in range(requests)))
+        wall = time.perf_counter() - start
+
+    result = {
+        "latency": stats(sequential),
+        "concurrency": concurrency,
+        "concurrent_latency": stats(concurrent),
+        "requests_per_s": round(requests / wall, 1),
+        "errors": errors,
+    }
+    log(f"query: {result['latency']['mean_ms']} ms, {result['requests_per_s']} req/s @ {concurrency}")
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50, help="documents in the synthetic corpus")
+    parser.add_argument("--doc-chars", type=int, default=20_000, help="approximate characters per document")
+    parser.add_argument("--search-sizes", default="1000,10000,100000")
+    parser.add_argument("--search-queries", type=int, default=50)
+    parser.add_argument("--query-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ollama-delay-ms", type=float, default=0.0, help="simulated generation time")
+    parser.add_argument("--save-load-repeats", type=int, default=3)
+    parser.add_argument("--embedder", choices=["sbert", "hash"], default="sbert")
+    parser.add_argument("--quick", action="store_true", help="small corpus and sizes, for smoke runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.docs, args.doc_chars = 10, 5_000
+        args.search_sizes = "1000,10000"
+        args.search_queries = args.query_requests = 20
+        args.save_load_repeats = 1
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as work_dir, \
+            StubOllama(delay_ms=args.ollama_delay_ms) as stub:
+        # Point the app at throwaway directories and the stub before any app module is imported
+        os.environ["DATA_DIR"] = os.path.join(work_dir, "data")
+        os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+        os.environ["OLLAMA_BASE_URL"] = stub.base_url
+
+        from app.config import settings
+        from app.core.embedder import embedder
+        from app.core.vector_store import vector_store
+
+        if args.embedder == "hash":
+            embedder._model = HashEmbeddingModel()
+
+        texts = corpus.make_corpus(args.docs, args.doc_chars, seed=args.seed)
+        questions = corpus.make_queries(max(args.query_requests, 1), seed=args.seed + 1)
+
+        stages = {"extract": bench_extract(texts, os.path.join(work_dir, "corpus"))}
+        per_doc_chunks, stages["chunk"] = bench_chunk(texts)
+        per_doc_embeddings, stages["embed"] = bench_embed(per_doc_chunks)
+        stages["add"] = bench_add(vector_store, per_doc_chunks, per_doc_embeddings)
+        stages["save_load"] = bench_save_load(vector_store, args.save_load_repeats)
+        stages["search"] = bench_search(
+            [int(s) for s in args.search_sizes.split(",")],
+            dim=stages["embed"]["dim"],
+            num_queries=args.search_queries,
+            top_k=settings.TOP_K,
+            num_shards=settings.NUM_SHARDS,
+            work_dir=os.path.join(work_dir, "search"),
+        )
+        stages["query"] = asyncio.run(bench_query(questions, args.query_requests, args.concurrency))
+
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "embedder": args.embedder if args.embedder == "hash" else settings.EMBEDDING_MODEL,
+                "settings": {
+                    "chunk_size": settings.CHUNK_SIZE,
+                    "chunk_overlap": settings.CHUNK_OVERLAP,
+                    "top_k": settings.TOP_K,
+                    "num_shards": settings.NUM_SHARDS,
+                },
+                "params": {k: v for k, v in vars(args).items() if k != "output"},
+            },
+            "stages": stages,
+        }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        log(f"wrote {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
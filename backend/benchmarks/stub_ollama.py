@@ -0,0 +1,92 @@
+"""
+Stub Ollama server for benchmarks.
+Implements just enough of the Ollama REST API (/api/generate, /api/tags) to exercise
+the query path end-to-end without a real model. The generation delay is configurable
+so the LLM's share of latency can be modelled or excluded.
+
+Usage (standalone):
+    python -m benchmarks.stub_ollama --port 11435 --delay-ms 0
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    delay_s = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "stub:latest"}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        self._send_json({
+            "model": payload.get("model", "stub"),
+            "response": f"Stub answer based on a {len(payload.get('prompt', ''))}-character prompt.",
+            "done": True,
+        })
+
+
+class StubOllama:
+    """Run the stub server on a background thread; usable as a context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay_ms: float = 0.0):
+        handler = type("Handler", (_Handler,), {"delay_s": delay_ms / 1000})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubOllama":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    with StubOllama(args.host, args.port, args.delay_ms) as stub:
+        print(f"Stub Ollama listening on {stub.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
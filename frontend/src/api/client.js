@@ -21,10 +21,20 @@ export async function uploadDocument(file) {
     return response.json();
 }
 
+const DOCUMENTS_PAGE_SIZE = 1000;
+
 export async function listDocuments() {
-    const response = await fetch(`${API_BASE}/documents/`);
-    if (!response.ok) throw new Error('Failed to fetch documents');
-    return response.json();
+    // The endpoint is paginated; fetch pages until X-Total-Count documents are in
+    const documents = [];
+    for (let offset = 0; ; offset += DOCUMENTS_PAGE_SIZE) {
+        const response = await fetch(`${API_BASE}/documents/?offset=${offset}&limit=${DOCUMENTS_PAGE_SIZE}`);
+        if (!response.ok) throw new Error('Failed to fetch documents');
+        const page = await response.json();
+        documents.push(...page);
+
+        const total = parseInt(response.headers.get('X-Total-Count'), 10);
+        if (page.length < DOCUMENTS_PAGE_SIZE || documents.length >= total) return documents;
+    }
 }
 
 export async function deleteDocument(docId) {